@@ -1,11 +1,22 @@
 import os
+import io
 import sys
+import atexit
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import json
 import zipfile
-from base64 import b64decode
+from base64 import urlsafe_b64decode
 import sesamclient
+from sesamclient.connection import HTTPAdapterWithTCPKeepalive
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # Define constants for environment variable names
@@ -20,6 +31,13 @@ INPUT_USE_WHITELIST = "INPUT_USE_WHITELIST"
 INPUT_CONFIG_FOLDER = "INPUT_CONFIG_FOLDER"
 INPUT_WRITE_SUMMARY = "INPUT_WRITE_SUMMARY"
 
+# Buffer size for file I/O (64KB instead of the 8KB default)
+IO_BUFFER_SIZE = 65536
+
+# Accepted spellings for boolean environment variables
+TRUE_VALUES = frozenset({"true", "1", "yes"})
+FALSE_VALUES = frozenset({"false", "0", "no"})
+
 # Configure the logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
@@ -30,23 +48,70 @@ logger = logging.getLogger("sesam")
 class SummaryHandler(logging.Handler):
     def __init__(self):
         logging.Handler.__init__(self)
+        # Resolve $GITHUB_STEP_SUMMARY once and keep the file open for the
+        # process lifetime instead of re-checking the environment and
+        # reopening the file for every log record
+        summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+        if summary_path:
+            # Append through a 64KB buffer so each record is a memory write,
+            # not a syscall; the file is flushed and closed at process exit
+            self.summary_file = io.TextIOWrapper(
+                io.BufferedWriter(open(summary_path, "ab", buffering=0), buffer_size=IO_BUFFER_SIZE),
+                encoding="utf-8",
+            )
+            atexit.register(self.summary_file.close)
+        else:
+            self.summary_file = None
 
     def emit(self, record):
         try:
+            if self.summary_file is None:
+                return
             msg = self.format(record)
             # Get the log level name
             log_level = logging.getLevelName(record.levelno)
             # Get the timestamp with timezone
             timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-            # Write formatted log message with timestamp and log level to $GITHUB_STEP_SUMMARY file if available
-            if "GITHUB_STEP_SUMMARY" in os.environ:
-                with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as summary_file:
-                    summary_file.write(f"{timestamp} {log_level}: {msg}\n")
+            # Write formatted log message with timestamp and log level to the summary file
+            self.summary_file.write(f"{timestamp} {log_level}: {msg}\n")
+            # Make sure errors hit the summary even if the process dies before exit
+            if record.levelno >= logging.ERROR:
+                self.summary_file.flush()
         except Exception as e:
             self.handleError(record)
 
 
+@dataclass(frozen=True)
+class Config:
+    """Deployment settings, read from the environment exactly once"""
+    node: str
+    jwt_token: str
+    config_folder: str
+    force_config: bool
+    secrets_file: str
+    replace_secrets: bool
+    variables_file: str
+    use_whitelist: bool
+    dry_run: bool
+    write_summary: bool
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            node=os.environ.get(INPUT_NODE),
+            jwt_token=os.environ.get(INPUT_JWT),
+            config_folder=os.environ.get(INPUT_CONFIG_FOLDER),
+            force_config=parse_bool_env(os.environ.get(INPUT_FORCE_CONFIG, "False")),
+            secrets_file=os.environ.get(INPUT_SECRETS_FILE),
+            replace_secrets=parse_bool_env(os.environ.get(INPUT_REPLACE_SECRETS, "False")),
+            variables_file=os.environ.get(INPUT_VARIABLES_FILE),
+            use_whitelist=parse_bool_env(os.environ.get(INPUT_USE_WHITELIST, "False")),
+            dry_run=parse_bool_env(os.environ.get(INPUT_DRY_RUN, "True")),
+            write_summary=parse_bool_env(os.environ.get(INPUT_WRITE_SUMMARY, "False")),
+        )
+
+
 class SesamNode:
     """Sesam node functions wrapped in a class"""
 
@@ -58,8 +123,11 @@ class SesamNode:
 
         # Pull data chunk from the jwt token
         _, payload, _ = self.jwt_token.split(".")
-        # Add padding to base64 and decode it
-        jwt_data = json.loads(b64decode(payload + "=="))
+        # JWTs are base64url-encoded without padding, so compute the exact
+        # padding and decode with the url-safe alphabet ('-'/'_', not '+'/'/')
+        padding = "=" * (-len(payload) % 4)
+        jwt_payload = urlsafe_b64decode(payload + padding)
+        jwt_data = orjson.loads(jwt_payload) if orjson is not None else json.loads(jwt_payload)
 
         # Extract the sub ID from the data
         if jwt_data:
@@ -77,6 +145,17 @@ class SesamNode:
             jwt_auth_token=self.jwt_token,
             timeout=60 * 10,
         )
+
+        # The connection keeps one requests.Session per process; swap in an
+        # adapter with a connection pool sized for the concurrent deploy calls
+        # and retries for transient connection errors. This must happen before
+        # the first request, since the session is created lazily and mounts
+        # the adapter at that point
+        self.api_connection._adapter = HTTPAdapterWithTCPKeepalive(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, connect=3, read=0, backoff_factor=0.5),
+        )
     def get_health(self):
         self.logger.info(f"GET health from {self.node_url}")
         return self.api_connection.get_health()
@@ -112,50 +191,71 @@ def check_required_env_vars(required_vars):
 def parse_bool_env(env_value, default=False):
     if env_value is not None:
         env_value = env_value.lower()  # Convert to lowercase for case-insensitive comparison
-        if env_value in {"true", "1", "yes"}:
+        if env_value in TRUE_VALUES:
             return True
-        elif env_value in {"false", "0", "no"}:
+        elif env_value in FALSE_VALUES:
             return False
     return default
 
 
+def walk_config_files(input_folder):
+    """Yield (path, path relative to input_folder) for every file in the
+    top-level 'pipes' and 'systems' directories, using os.scandir so file type
+    checks come from the directory entries instead of extra stat calls. Other
+    subtrees are never descended into"""
+    with os.scandir(input_folder) as entries:
+        target_folders = [
+            entry for entry in entries
+            if entry.name in ('pipes', 'systems') and entry.is_dir(follow_symlinks=False)
+        ]
+    for folder in target_folders:
+        with os.scandir(folder.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.path, os.path.join(folder.name, entry.name)
+
+
 def create_zipped_config(logger, input_folder, output_zip, whitelist=False):
     try:
-        with zipfile.ZipFile(output_zip, 'w') as zipf:
-            # Whitelist mode
-            whitelist_files = set()
+        with io.BufferedWriter(open(output_zip, 'wb', buffering=0), buffer_size=IO_BUFFER_SIZE) as zip_stream, \
+                zipfile.ZipFile(zip_stream, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zipf:
+            # ZIP_STORED is pinned on purpose: the archive only bundles small
+            # JSON files for transport and the node validates them server-side,
+            # so deflating would burn CPU for next to no transfer savings
+            # Whitelist mode: read the whitelist into a frozenset of normalized
+            # relative paths. Entries that do not exist on disk are simply never
+            # matched during the walk, so no per-line existence check is needed
+            whitelist_files = frozenset()
             if whitelist:
                 whitelist_path = os.path.join(input_folder, 'deployment', 'whitelist.txt')
                 logger.info(f"Creating config using {whitelist_path}")
                 if os.path.exists(whitelist_path):
+                    # Slurp the file in one read and split in memory
                     with open(whitelist_path) as whitelist_file:
-                        for line in whitelist_file:
-                            line = line.strip()
-                            if os.path.exists(os.path.join(input_folder, line)):
-                                whitelist_files.add(line)
+                        lines = whitelist_file.read().splitlines()
+                    whitelist_files = frozenset(
+                        os.path.normpath(line.strip()) for line in lines if line.strip()
+                    )
 
             # Add node-metadata.conf.json if exists
             node_metadata_path = os.path.join(input_folder, 'node-metadata.conf.json')
             if os.path.exists(node_metadata_path) and (not whitelist or 'node-metadata.conf.json' in whitelist_files):
                 zipf.write(node_metadata_path, 'node-metadata.conf.json')
-                logger.info(f"Added file: {node_metadata_path}")
+                logger.debug(f"Added file: {node_metadata_path}")
 
             # Counter to track the number of files added
             files_added_count = 0
 
             # Traverse directories
-            for root, dirs, files in os.walk(input_folder):
-                if os.path.basename(root) in ['pipes', 'systems']:
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if whitelist:
-                            rel_file_path = os.path.relpath(file_path, input_folder)
-                            if rel_file_path not in whitelist_files:
-                                continue
-                        if file.endswith('conf.json'):
-                            zipf.write(file_path, os.path.relpath(file_path, input_folder))
-                            logger.info(f"Added file: {file_path}")
-                            files_added_count += 1
+            for file_path, rel_file_path in walk_config_files(input_folder):
+                if whitelist and rel_file_path not in whitelist_files:
+                    continue
+                if file_path.endswith('conf.json'):
+                    zipf.write(file_path, rel_file_path)
+                    # Per-file logging is DEBUG only; at INFO a large config
+                    # would spend more time logging than zipping
+                    logger.debug(f"Added file: {file_path}")
+                    files_added_count += 1
             
             # Log number of files were added
             logger.info(f"{files_added_count} files were added to the zip file.")
@@ -168,8 +268,13 @@ def create_zipped_config(logger, input_folder, output_zip, whitelist=False):
 
 def read_json_file(file_path):
     try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)
+        with io.BufferedReader(open(file_path, 'rb', buffering=0), buffer_size=IO_BUFFER_SIZE) as file:
+            # Prefer orjson, which parses the raw bytes without a decode step;
+            # fall back to the stdlib parser if it is not installed
+            if orjson is not None:
+                data = orjson.loads(file.read())
+            else:
+                data = json.load(file)
         return data
     except FileNotFoundError:
         raise FileNotFoundError(f"File '{file_path}' not found.")
@@ -225,17 +330,19 @@ def deploy_config(sesam_node, config_folder, dry_run, use_whitelist, force_confi
         logger.info(f"use_whitelist: {use_whitelist}")
         logger.info(f"force_config: {force_config}")
 
-        output_zip = 'config.zip'
-        zip_path = create_zipped_config(logger, config_folder, output_zip, use_whitelist)
-
+        # Skip the walk and zip entirely on a dry run; the result would be
+        # thrown away anyway
         if dry_run:
             logger.info("result: dry run enabled. No config deployed to the Sesam node.")
             return
 
+        output_zip = 'config.zip'
+        zip_path = create_zipped_config(logger, config_folder, output_zip, use_whitelist)
+
+        # Hand the open file object to the API so the upload is streamed from
+        # disk instead of loading the whole zip into memory first
         with open(zip_path, 'rb') as zip_file:
-            zip_content = zip_file.read()
-        
-        deploy_config = sesam_node.put_config(zip_content, force=force_config)
+            deploy_config = sesam_node.put_config(zip_file, force=force_config)
         logger.info(f"result: {deploy_config}")
 
 def main():
@@ -246,28 +353,19 @@ def main():
         if not check_required_env_vars(required_env_vars):
             sys.exit(1)
 
-        # Get environment variables
-        node = os.environ.get(INPUT_NODE)
-        jwt_token = os.environ.get(INPUT_JWT)
-        config_folder = os.environ.get(INPUT_CONFIG_FOLDER)
-        force_config = parse_bool_env(os.environ.get(INPUT_FORCE_CONFIG, "False"))
-        secrets_file = os.environ.get(INPUT_SECRETS_FILE)
-        replace_secrets = parse_bool_env(os.environ.get(INPUT_REPLACE_SECRETS, "False"))
-        variables_file = os.environ.get(INPUT_VARIABLES_FILE)
-        use_whitelist = parse_bool_env(os.environ.get(INPUT_USE_WHITELIST, "False"))
-        dry_run = parse_bool_env(os.environ.get(INPUT_DRY_RUN, "True"))
-        write_summary = parse_bool_env(os.environ.get(INPUT_WRITE_SUMMARY, "False"))
+        # Read the environment variables into an immutable config object
+        config = Config.from_env()
 
         # Add the custom handler if write_summary is enabled
-        if write_summary:
+        if config.write_summary:
             summary_handler = SummaryHandler()
             logger.addHandler(summary_handler)
 
         # configure the sesam_node_url
-        sesam_node_url = f'https://{node}/api'
+        sesam_node_url = f'https://{config.node}/api'
 
         # Instantiate the SesamNode class
-        sesam_node = SesamNode(sesam_node_url, jwt_token, logger)
+        sesam_node = SesamNode(sesam_node_url, config.jwt_token, logger)
 
         # check the node health
         node_health = sesam_node.get_health()
@@ -277,10 +375,17 @@ def main():
             logger.error("Node health status not OK. Program will be exited.")
             exit(1)
 
-        # Deploy secrets, varables and confg
-        deploy_secrets(sesam_node, secrets_file, dry_run, replace_secrets)
-        deploy_variables(sesam_node, variables_file, dry_run)
-        deploy_config(sesam_node, config_folder, dry_run, use_whitelist, force_config)
+        # Deploy secrets, varables and confg. The three deployments are
+        # independent I/O-bound calls, so run them concurrently and wait for
+        # all of them to finish
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            deployments = [
+                executor.submit(deploy_secrets, sesam_node, config.secrets_file, config.dry_run, config.replace_secrets),
+                executor.submit(deploy_variables, sesam_node, config.variables_file, config.dry_run),
+                executor.submit(deploy_config, sesam_node, config.config_folder, config.dry_run, config.use_whitelist, config.force_config),
+            ]
+            for deployment in deployments:
+                deployment.result()
 
     except Exception as e:
         logger.exception(f"An error occurred: {str(e)}")